@@ -0,0 +1,27 @@
+from typing import TextIO
+
+
+def write_table(out_file: TextIO, rows: list, params: dict[str, str]) -> None:
+    """Write text table filled with data to file line by line.
+
+    Columns are separated by '|' and header is separated from rows by
+    a line of '-'.
+
+    Args:
+        out_file (TextIO): output file.
+        rows (list[tuple]): data for filling.
+        params (dict): column names and align parametres.
+    """
+    table = [list(params), *rows]
+    widths = [max(len(f'{cell}') for cell in column) for column in zip(*table)]
+    justifies = [
+        {'l': str.ljust, 'r': str.rjust}.get(align, str.center)
+        for align in params.values()
+    ]
+
+    lines = ('|'.join(f' {justify(f"{cell}", width)} '
+                      for cell, width, justify in zip(row, widths, justifies))
+             + '\n' for row in table)
+    out_file.write(next(lines))
+    out_file.write('+'.join('-' * (width + 2) for width in widths) + '\n')
+    out_file.writelines(lines)
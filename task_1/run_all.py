@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from lxml import etree as ET
+
+import script_1
+import script_2
+import script_3
+import script_4
+from script_1 import get_files
+
+
+def process(file: Path) -> None:
+    """Parse xml-document once and write reports of all scripts.
+
+    script_4 updates the tree in place, so it is emitted last.
+
+    Args:
+        file (Path): xml-document.
+    """
+    tree = ET.parse(file)
+    script_1.emit(tree, file)
+    script_2.emit(tree, file)
+    script_3.emit(tree, file)
+    script_4.emit(tree, file)
+
+
+if __name__ == '__main__':
+    try:
+        files = get_files()
+    except FileNotFoundError as err:
+        print(f'File not found by path: {err}.')
+    except ValueError as err:
+        print(f'Extension must be .xml, not {err}.')
+    else:
+        with ProcessPoolExecutor() as executor:
+            list(executor.map(process, files))
+    finally:
+        print('Script is stopped!')
@@ -1,20 +1,33 @@
 #!/usr/bin/env python3
 
-import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from os import scandir
 from pathlib import Path
 from sys import argv
 
-import prettytable as pt
+import numpy as np
+from lxml import etree as ET
+
+from _table import write_table
 
 # Dictionary with column names and align types for table
-TABLE_PARAMS = {'Parameter': 'l', 'Value': 'x'}
+TABLE_PARAMS = {'Parameter': 'l', 'Value': 'c'}
+
+# Buffer size in bytes for writing output file
+BUFFER_SIZE = 1 << 20
+
+# Compiled XPath expressions for <image> elements and their subelements
+IMAGES_XPATH = ET.XPath('image')
+ANNOTATED_IMAGES_XPATH = ET.XPath('image[*]')
+SHAPES_XPATH = ET.XPath('image/*')
 
 
 def get_files() -> list[Path]:
     """Return Path objects of target files.
 
     Return paths of xml files specified in script parameters or all xml
-    files from current directiry.
+    files from current directiry. The directory is read once, so files
+    found in it aren't checked for existence again.
 
     Raises:
         FileNotFoundError: If the target file is not found.
@@ -24,11 +37,13 @@ def get_files() -> list[Path]:
         list[Path]: list of target files.
     """
     current_path = Path.cwd()
+    with scandir(current_path) as dir_entries:
+        entries = {entry.name: entry for entry in dir_entries}
     files = []
 
     for arg in argv[1:]:
         file = current_path / arg
-        if not file.exists():
+        if arg not in entries and not file.exists():
             raise FileNotFoundError(file)
         elif file.suffix != '.xml':
             raise ValueError(file.suffix)
@@ -36,103 +51,98 @@ def get_files() -> list[Path]:
             files.append(file)
 
     if not files:
-        files = list(current_path.glob('*.xml'))
+        files = [
+            current_path / name for name in entries if name.endswith('.xml')
+        ]
 
     return files
 
 
-def create_table(rows: list[list[str]], params: dict[str,
-                                                     str]) -> pt.PrettyTable:
-    """Return PrettyTable object filled with data.
+def get_image_size(image: ET.Element) -> int:
+    """Return size of image from <image> element as height multiplied by width.
 
     Args:
-        rows (list[tuple]): data for filling.
-        params (dict): column names and align parametres.
+        image (ET.Element): <image> element.
 
     Returns:
-        PrettyTable: PrettyTable object.
+        int: size.
     """
-    table = pt.PrettyTable()
-    table.field_names = params
-    table.add_rows(rows)
-    for k, v in params.items():
-        table.align[k] = v
-    table.border = False
-    table.preserve_internal_border = True
-    return table
+    size = int(image.get('height', 0)) * int(image.get('width', 0))
+    return size
 
 
-def get_images(tree: ET.ElementTree) -> list[ET.Element]:
-    """Return list of elements with <image> tag.
+def get_extreme_images(
+        images: list[ET.Element]) -> tuple[list[ET.Element], list[ET.Element]]:
+    """Return lists of <image> elements with the largest and smallest sizes.
+
+    Sizes are computed once into array, extremes are found with NumPy.
 
     Args:
-        tree (ET.ElementTree): xml tree.
+        images (list[ET.Element]): list of <image> elements.
 
     Returns:
-        list[ET.Element]: list of <image> elements.
+        tuple[list[ET.Element], list[ET.Element]]: largest and smallest
+        <image> elements.
     """
-    root = tree.getroot()
-    images = root.findall('image')
-    return images
+    sizes = np.fromiter(map(get_image_size, images),
+                        dtype=np.int64,
+                        count=len(images))
+    largest_images = [images[i] for i in np.flatnonzero(sizes == sizes.max())]
+    smallest_images = [images[i] for i in np.flatnonzero(sizes == sizes.min())]
+    return largest_images, smallest_images
 
 
-def get_annotated_images(images: list[ET.Element]) -> list[ET.Element]:
-    """Return list of <image> elements containing subelements.
+def emit(tree: ET.ElementTree, file: Path) -> None:
+    """Write common statistics of xml-document to text file.
 
     Args:
-        images (list[ET.Element]): list of <image> elements.
-
-    Returns:
-        list[ET.Element]: list of <image> elements.
+        tree (ET.ElementTree): xml tree of the document.
+        file (Path): xml-document.
     """
-    annotated_images = list(filter(len, images))
-    return annotated_images
+    root = tree.getroot()
+    rows = []
 
+    images = IMAGES_XPATH(root)
+    images_number = len(images)
+    rows.append(['Images', images_number])
 
-def get_shapes(images: list[ET.Element]) -> list[ET.Element]:
-    """Return list of subelements from all elements.
+    annotated_images_number = len(ANNOTATED_IMAGES_XPATH(root))
+    not_annotated_images_number = images_number - annotated_images_number
 
-    Args:
-        images (list[ET.Element]): list of <image> elements.
+    rows.append(['Annotated images', annotated_images_number])
+    rows.append(['Not annotated images', not_annotated_images_number])
 
-    Returns:
-        list[ET.Element]: list of <image> elements.
-    """
-    shapes = []
-    for image in images:
-        shapes.extend(image.iterfind('*'))
-    return shapes
+    shapes_number = len(SHAPES_XPATH(root))
+    rows.append(['shapes', shapes_number])
 
+    largest_images, smallest_images = get_extreme_images(images)
+    largest_images_number = len(largest_images)
+    smallest_images_number = len(smallest_images)
 
-def get_image_size(image: ET.Element) -> int:
-    """Return size of image from <image> element as height multiplied by width.
+    rows.extend(
+        [['Largest images', largest_images_number],
+         ['Largest image', largest_images[0].get("name")],
+         ['Largest image height', largest_images[0].get("height")],
+         ['Largest image width', largest_images[0].get("width")],
+         ['Smallest images', smallest_images_number],
+         ['Smallest image', smallest_images[0].get("name")],
+         ['Smallest image height', smallest_images[0].get("height")],
+         ['Smallest image width', smallest_images[0].get("width")]])
 
-    Args:
-        image (ET.Element): <image> element.
-
-    Returns:
-        int: size.
-    """
-    height = int(image.get('height', default=0))
-    width = int(image.get('width', default=0))
-    size = height * width
-    return size
+    dir_name = Path(f'{file.stem}')
+    dir_name.mkdir(exist_ok=True)
+    with open(f'{dir_name}/common.txt', 'w',
+              buffering=BUFFER_SIZE) as out_file:
+        write_table(out_file, rows, TABLE_PARAMS)
 
 
-def get_extreme_images(images: list[ET.Element], func=max) -> list[ET.Element]:
-    """Return list of <image> elements with extremal (min or max) sizes.
+def process(file: Path) -> None:
+    """Parse xml-document and write its common statistics.
 
     Args:
-        images (list[ET.Element]): list of <image> elements.
-        func (_type_, optional): max or min function. Defaults to max.
-
-    Returns:
-        list[ET.Element]: list of extremal <image> elements.
+        file (Path): xml-document.
     """
-    extreme_image = func(images, key=get_image_size)
-    max_size = get_image_size(extreme_image)
-    extreme_images = [img for img in images if get_image_size(img) == max_size]
-    return extreme_images
+    emit(ET.parse(file), file)
 
 
 if __name__ == '__main__':
@@ -143,49 +153,7 @@ if __name__ == '__main__':
     except ValueError as err:
         print(f'Extension must be .xml, not {err}.')
     else:
-        for file in files:
-            tree = ET.parse(file)
-            rows = []
-
-            images = get_images(tree)
-            images_number = len(images)
-            rows.append(['Images', images_number])
-
-            annotated_images = get_annotated_images(images)
-            annotated_images_number = len(annotated_images)
-            not_annotated_images_number = 0
-
-            if images_number != annotated_images_number:
-                not_annotated_images_number = \
-                                    images_number - annotated_images_number
-
-            rows.append(['Annotated images', annotated_images_number])
-            rows.append(['Not annotated images', not_annotated_images_number])
-
-            shapes = get_shapes(annotated_images)
-            shapes_number = len(shapes)
-            rows.append(['shapes', shapes_number])
-
-            largest_images = get_extreme_images(images, max)
-            smallest_images = get_extreme_images(images, min)
-            largest_images_number = len(largest_images)
-            smallest_images_number = len(smallest_images)
-
-            rows.extend(
-                [['Largest images', largest_images_number],
-                 ['Largest image', largest_images[0].get("name")],
-                 ['Largest image height', largest_images[0].get("height")],
-                 ['Largest image width', largest_images[0].get("width")],
-                 ['Smallest images', smallest_images_number],
-                 ['Smallest image', smallest_images[0].get("name")],
-                 ['Smallest image height', smallest_images[0].get("height")],
-                 ['Smallest image width', smallest_images[0].get("width")]])
-            table = create_table(rows, TABLE_PARAMS)
-            file_info = table.get_string()
-
-            dir_name = Path(f'{file.stem}')
-            dir_name.mkdir(exist_ok=True)
-            with open(f'{dir_name}/common.txt', 'w') as out_file:
-                out_file.write(file_info)
+        with ProcessPoolExecutor() as executor:
+            list(executor.map(process, files))
     finally:
         print('Script is stopped!')
@@ -1,21 +1,31 @@
 #!/usr/bin/env python3
 
-import xml.etree.ElementTree as ET
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from os import scandir
 from pathlib import Path
 from sys import argv
 
-import prettytable as pt
+from lxml import etree as ET
+
+from _table import write_table
 
 # Dictionary with column names and align types for table
-TABLE_PARAMS = {'Class name': 'l', 'Quantity': 'x'}
+TABLE_PARAMS = {'Class name': 'l', 'Quantity': 'c'}
+
+# Buffer size in bytes for writing output file
+BUFFER_SIZE = 1 << 20
+
+# Compiled XPath expression for 'label' attributes of <image> subelements
+LABELS_XPATH = ET.XPath('image/*/@label', smart_strings=False)
 
 
 def get_files() -> list[Path]:
     """Return Path objects of target files.
 
     Return paths of xml files specified in script parameters or all xml
-    files from current directiry.
+    files from current directiry. The directory is read once, so files
+    found in it aren't checked for existence again.
 
     Raises:
         FileNotFoundError: If the target file is not found.
@@ -25,11 +35,13 @@ def get_files() -> list[Path]:
         list[Path]: list of target files.
     """
     current_path = Path.cwd()
+    with scandir(current_path) as dir_entries:
+        entries = {entry.name: entry for entry in dir_entries}
     files = []
 
     for arg in argv[1:]:
         file = current_path / arg
-        if not file.exists():
+        if arg not in entries and not file.exists():
             raise FileNotFoundError(file)
         elif file.suffix != '.xml':
             raise ValueError(file.suffix)
@@ -37,62 +49,51 @@ def get_files() -> list[Path]:
             files.append(file)
 
     if not files:
-        files = list(current_path.glob('*.xml'))
+        files = [
+            current_path / name for name in entries if name.endswith('.xml')
+        ]
 
     return files
 
 
-def create_table(rows: list[tuple[str, int]],
-                 params: dict[str, str]) -> pt.PrettyTable:
-    """Return PrettyTable object filled with data.
-
-    Args:
-        rows (list[tuple]): data for filling.
-        params (dict): column names and align parametres.
-
-    Returns:
-        PrettyTable: PrettyTable object.
-    """
-    table = pt.PrettyTable()
-    table.field_names = params
-    table.add_rows(rows)
-    for k, v in params.items():
-        table.align[k] = v
-    table.border = False
-    table.preserve_internal_border = True
-    return table
-
-
-def get_classes(tree: ET.ElementTree) -> list[str]:
-    """Return list of all subelements classes
+def get_classes(tree: ET.ElementTree) -> Counter[str]:
+    """Return counter of all subelements classes
     of <image> tags from attribute 'label'.
 
     Args:
         tree (ET.ElementTree): xml tree.
 
     Returns:
-        list[str]: list of classes.
+        Counter[str]: quantity of classes.
     """
     root = tree.getroot()
-    classes = []
-    for image in root.iter('image'):
-        for tag in image.iterfind('*'):
-            classes.append(tag.get('label'))
+    classes = Counter(LABELS_XPATH(root))
     return classes
 
 
-def count_classes(classes: list[str]) -> list[tuple[str, int]]:
-    """Return list of tuples with class name and quantity for table's rows.
+def emit(tree: ET.ElementTree, file: Path) -> None:
+    """Write classes quantity of xml-document to text file.
 
     Args:
-        classes (list[str]): list of classes
+        tree (ET.ElementTree): xml tree of the document.
+        file (Path): xml-document.
+    """
+    rows = get_classes(tree).most_common()
 
-    Returns:
-        list[tuple[str, int]]: list of rows.
+    dir_name = Path(f'{file.stem}')
+    dir_name.mkdir(exist_ok=True)
+    with open(f'{dir_name}/classes.txt', 'w',
+              buffering=BUFFER_SIZE) as out_file:
+        write_table(out_file, rows, TABLE_PARAMS)
+
+
+def process(file: Path) -> None:
+    """Parse xml-document and write its classes quantity.
+
+    Args:
+        file (Path): xml-document.
     """
-    counter = Counter(classes)
-    rows = counter.most_common()
-    return rows
+    emit(ET.parse(file), file)
 
 
 if __name__ == '__main__':
@@ -103,18 +104,7 @@ if __name__ == '__main__':
     except ValueError as err:
         print(f'Extension must be .xml, not {err}.')
     else:
-        for file in files:
-            tree = ET.parse(file)
-
-            classes = get_classes(tree)
-
-            rows = count_classes(classes)
-            table = create_table(rows, TABLE_PARAMS)
-            file_info = table.get_string()
-
-            dir_name = Path(f'{file.stem}')
-            dir_name.mkdir(exist_ok=True)
-            with open(f'{dir_name}/classes.txt', 'w') as out_file:
-                out_file.write(file_info)
+        with ProcessPoolExecutor() as executor:
+            list(executor.map(process, files))
     finally:
         print('Script is stopped!')
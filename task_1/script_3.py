@@ -1,21 +1,28 @@
 #!/usr/bin/env python3
 
-import xml.etree.ElementTree as ET
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from os import scandir
 from pathlib import Path
 from sys import argv
 
-import prettytable as pt
+from lxml import etree as ET
+
+from _table import write_table
 
 # Dictionary with column names and align types for table
-TABLE_PARAMS = {'Shape type': 'l', 'Quantity': 'x'}
+TABLE_PARAMS = {'Shape type': 'l', 'Quantity': 'c'}
+
+# Buffer size in bytes for writing output file
+BUFFER_SIZE = 1 << 20
 
 
 def get_files() -> list[Path]:
     """Return Path objects of target files.
 
     Return paths of xml files specified in script parameters or all xml
-    files from current directiry.
+    files from current directiry. The directory is read once, so files
+    found in it aren't checked for existence again.
 
     Raises:
         FileNotFoundError: If the target file is not found.
@@ -25,11 +32,13 @@ def get_files() -> list[Path]:
         list[Path]: list of target files.
     """
     current_path = Path.cwd()
+    with scandir(current_path) as dir_entries:
+        entries = {entry.name: entry for entry in dir_entries}
     files = []
 
     for arg in argv[1:]:
         file = current_path / arg
-        if not file.exists():
+        if arg not in entries and not file.exists():
             raise FileNotFoundError(file)
         elif file.suffix != '.xml':
             raise ValueError(file.suffix)
@@ -37,61 +46,51 @@ def get_files() -> list[Path]:
             files.append(file)
 
     if not files:
-        files = list(current_path.glob('*.xml'))
+        files = [
+            current_path / name for name in entries if name.endswith('.xml')
+        ]
 
     return files
 
 
-def create_table(rows: list[tuple[str, int]],
-                 params: dict[str, str]) -> pt.PrettyTable:
-    """Return PrettyTable object filled with data.
+def get_shapes(tree: ET.ElementTree) -> Counter[str]:
+    """Return counter of all subelement tags (shapes) of <image> tags.
 
     Args:
-        rows (list[tuple]): data for filling.
-        params (dict): column names and align parametres.
+        tree (ET.ElementTree): xml tree.
 
     Returns:
-        PrettyTable: PrettyTable object.
+        Counter[str]: quantity of shapes.
     """
-    table = pt.PrettyTable()
-    table.field_names = params
-    table.add_rows(rows)
-    for k, v in params.items():
-        table.align[k] = v
-    table.border = False
-    table.preserve_internal_border = True
-    return table
+    root = tree.getroot()
+    shapes = Counter(tag.tag for image in root.iterchildren('image')
+                     for tag in image.iterchildren('*'))
+    return shapes
 
 
-def get_shapes(tree: ET.ElementTree) -> list[str]:
-    """Return all subelement tags (shapes) of <image> tags.
+def emit(tree: ET.ElementTree, file: Path) -> None:
+    """Write shapes quantity of xml-document to text file.
 
     Args:
-        tree (ET.ElementTree): xml tree.
-
-    Returns:
-        list[str]: list of shapes.
+        tree (ET.ElementTree): xml tree of the document.
+        file (Path): xml-document.
     """
-    root = tree.getroot()
-    shapes = []
-    for image in root.iter('image'):
-        for tag in image.iterfind('*'):
-            shapes.append(tag.tag)
-    return shapes
+    rows = get_shapes(tree).most_common()
 
+    dir_name = Path(f'{file.stem}')
+    dir_name.mkdir(exist_ok=True)
+    with open(f'{dir_name}/shapes.txt', 'w',
+              buffering=BUFFER_SIZE) as out_file:
+        write_table(out_file, rows, TABLE_PARAMS)
 
-def count_shapes(shapes: list[str]) -> list[tuple[str, int]]:
-    """Return list of tuples with shape's types and quantity for table's rows.
 
-    Args:
-        shapes (list[str]): list of shapes.
+def process(file: Path) -> None:
+    """Parse xml-document and write its shapes quantity.
 
-    Returns:
-        list[tuple[str, int]]: list of rows.
+    Args:
+        file (Path): xml-document.
     """
-    counter = Counter(shapes)
-    rows = counter.most_common()
-    return rows
+    emit(ET.parse(file), file)
 
 
 if __name__ == '__main__':
@@ -102,18 +101,7 @@ if __name__ == '__main__':
     except ValueError as err:
         print(f'Extension must be .xml, not {err}.')
     else:
-        for file in files:
-            tree = ET.parse(file)
-
-            shapes = get_shapes(tree)
-
-            rows = count_shapes(shapes)
-            table = create_table(rows, TABLE_PARAMS)
-            file_info = table.get_string()
-
-            dir_name = Path(f'{file.stem}')
-            dir_name.mkdir(exist_ok=True)
-            with open(f'{dir_name}/shapes.txt', 'w') as out_file:
-                out_file.write(file_info)
+        with ProcessPoolExecutor() as executor:
+            list(executor.map(process, files))
     finally:
         print('Script is stopped!')
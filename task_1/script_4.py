@@ -1,15 +1,23 @@
 #!/usr/bin/env python3
 
-import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from os import scandir
+from os.path import basename, splitext
 from pathlib import Path
 from sys import argv
 
+from lxml import etree as ET
+
+# Buffer size in bytes for writing output file
+BUFFER_SIZE = 1 << 20
+
 
 def get_files() -> list[Path]:
     """Return Path objects of target files.
 
     Return paths of xml files specified in script parameters or all xml
-    files from current directiry.
+    files from current directiry. The directory is read once, so files
+    found in it aren't checked for existence again.
 
     Raises:
         FileNotFoundError: If the target file is not found.
@@ -19,11 +27,13 @@ def get_files() -> list[Path]:
         list[Path]: list of target files.
     """
     current_path = Path.cwd()
+    with scandir(current_path) as dir_entries:
+        entries = {entry.name: entry for entry in dir_entries}
     files = []
 
     for arg in argv[1:]:
         file = current_path / arg
-        if not file.exists():
+        if arg not in entries and not file.exists():
             raise FileNotFoundError(file)
         elif file.suffix != '.xml':
             raise ValueError(file.suffix)
@@ -31,62 +41,65 @@ def get_files() -> list[Path]:
             files.append(file)
 
     if not files:
-        files = list(current_path.glob('*.xml'))
+        files = [
+            current_path / name for name in entries if name.endswith('.xml')
+        ]
 
     return files
 
 
-def invert_images_ids(tree: ET.ElementTree) -> ET.ElementTree:
-    """Return updated structure of xml-document with inverted images ids.
+def update_images(tree: ET.ElementTree, extension: str) -> ET.ElementTree:
+    """Return updated structure of xml-document.
+
+    Images ids are inverted, images extensions are changed and images
+    paths are deleted in a single pass over <image> elements.
 
     Args:
         tree (ET.ElementTree): source xml-structure.
+        extension (str): new images extension.
 
     Returns:
         ET.ElementTree: output xml-structure.
     """
     root = tree.getroot()
-    images_number = len(root.findall('image'))
-    for image in root.iter('image'):
+    images = list(root.iterchildren('image'))
+    images_number = len(images)
+    for image in images:
         id = int(image.get('id'))  # type: ignore
         new_id = images_number - (id + 1)
         image.set('id', str(new_id))
+
+        name, _ = splitext(basename(image.get('name')))  # type: ignore
+        image.set('name', name + extension)
     return tree
 
 
-def change_images_extensions(tree: ET.ElementTree,
-                             extension: str) -> ET.ElementTree:
-    """Return updated structure of xml-document with changed images extensions.
+def emit(tree: ET.ElementTree, file: Path) -> None:
+    """Write updated copy of xml-document.
 
-    Args:
-        tree (ET.ElementTree): source xml-structure.
+    The tree is updated in place.
 
-    Returns:
-        ET.ElementTree: output xml-structure.
+    Args:
+        tree (ET.ElementTree): xml tree of the document.
+        file (Path): xml-document.
     """
-    root = tree.getroot()
-    for image in root.iter('image'):
-        name = Path(image.get('name'))  # type: ignore
-        name = name.with_suffix(extension)
-        image.set('name', str(name))
-    return tree
+    updated_tree = update_images(tree, '.png')
 
+    with open(f'{file.stem}-updated.xml', 'wb',
+              buffering=BUFFER_SIZE) as out_file:
+        updated_tree.write(out_file,
+                           encoding='utf-8',
+                           xml_declaration=True,
+                           pretty_print=False)
 
-def delete_images_paths(tree: ET.ElementTree) -> ET.ElementTree:
-    """Return updated structure of xml-document with deleteded images paths.
 
-    Args:
-        tree (ET.ElementTree): source xml-structure.
+def process(file: Path) -> None:
+    """Parse xml-document and write its updated copy.
 
-    Returns:
-        ET.ElementTree: output xml-structure.
+    Args:
+        file (Path): xml-document.
     """
-    root = tree.getroot()
-    for image in root.iter('image'):
-        name = Path(image.get('name'))  # type: ignore
-        name = name.name
-        image.set('name', str(name))
-    return tree
+    emit(ET.parse(file), file)
 
 
 if __name__ == '__main__':
@@ -97,15 +110,7 @@ if __name__ == '__main__':
     except ValueError as err:
         print(f'Extension must be .xml, not {err}.')
     else:
-        for file in files:
-            tree = ET.parse(file)
-
-            updated_tree = invert_images_ids(tree)
-            updated_tree = change_images_extensions(updated_tree, '.png')
-            updated_tree = delete_images_paths(updated_tree)
-
-            tree.write(f'{file.stem}-updated.xml',
-                       encoding='utf-8',
-                       xml_declaration=True)
+        with ProcessPoolExecutor() as executor:
+            list(executor.map(process, files))
     finally:
         print('Script is stopped!')
@@ -1,18 +1,26 @@
 #!/usr/bin/env python3
 
-import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from os import scandir
+from os.path import basename
 from pathlib import Path
 from sys import argv
 
 import cv2 as cv
 import numpy as np
+from lxml import etree as ET
+
+# Compiled XPath expression for color of the <label> element
+COLOR_XPATH = ET.XPath('string(color)')
 
 
 def get_files(extension: str, path: str = '') -> list[Path]:
     """Return Path objects of target files.
 
     Return paths of images specified in script parameters
-    or all images from images directiry.
+    or all images from images directiry. The directory is read once,
+    so files found in it aren't checked for existence again.
 
     Raises:
         FileNotFoundError: If the target file is not found.
@@ -22,11 +30,13 @@ def get_files(extension: str, path: str = '') -> list[Path]:
         list[Path]: list of target files.
     """
     files_path = Path.cwd() / path
+    with scandir(files_path) as dir_entries:
+        entries = {entry.name: entry for entry in dir_entries}
     files = []
 
     for arg in argv[1:]:
         file = files_path / arg
-        if not file.exists():
+        if arg not in entries and not file.exists():
             raise FileNotFoundError(file)
         elif file.suffix != extension:
             raise ValueError(file.suffix)
@@ -34,7 +44,9 @@ def get_files(extension: str, path: str = '') -> list[Path]:
             files.append(file)
 
     if not files:
-        files = list(files_path.glob(f'*{extension}'))
+        files = [
+            files_path / name for name in entries if name.endswith(extension)
+        ]
 
     return files
 
@@ -56,20 +68,17 @@ def make_directories(dir_names: list[str]) -> list[Path]:
     return dir_paths
 
 
-def get_color(tree: ET.ElementTree) -> tuple:
+def get_color(label_tag: ET.Element) -> tuple:
     """Return mask color.
 
     Args:
-        tree (ET.ElementTree): source xml-structure.
+        label_tag (ET.Element): <label> element.
 
     Returns:
         tuple: mask color.
     """
-    root = tree.getroot()
-    label = root.find('.//label')
-    color = label.find('color')  # type: ignore
-    color = color.text[1:]  # type: ignore
-    color = tuple(int(color[i:i + 2], 16) for i in (4, 2, 0))
+    red, green, blue = bytes.fromhex(COLOR_XPATH(label_tag).lstrip('#'))
+    color = (blue, green, red)
     return color
 
 
@@ -91,35 +100,47 @@ def get_shapes(image_tag: ET.Element) -> list[dict]:
     return shapes
 
 
-def parse_annotation(tree: ET.ElementTree, image_name: str) -> dict:
-    """Return annotation for image from xml-structure with annotations.
+def parse_annotations(path: Path) -> tuple[tuple, dict[str, dict]]:
+    """Return mask color and annotations for all images from xml-document.
+
+    The document is read once with iterparse, processed elements are
+    cleared, so only collected annotations are kept in memory.
 
     Args:
-        tree (ET.ElementTree): xml-structure with annotations.
-        image_name (str): image name.
+        path (Path): xml-document with annotations.
 
     Returns:
-        dict: dictionary with annotation for image.
+        tuple[tuple, dict[str, dict]]: mask color and dictionary with
+        annotations by image names.
     """
-    annotation = dict()
-    root = tree.getroot()
-    for image_tag in root.iter('image'):
-        name = Path(image_tag.get('name')).name  # type: ignore
-        if name == image_name:
-            image_tag.set('name', name)
-            image = {key: value for key, value in image_tag.items()}
-            image['shapes'] = get_shapes(image_tag)
-            annotation = image
-    return annotation
-
-
-def create_overlay(width: int, height: int, shapes: list[dict]) -> np.ndarray:
+    color = tuple()
+    annotations = dict()
+    for _, tag in ET.iterparse(f'{path}', tag=('label', 'image')):
+        if tag.tag == 'label':
+            color = color or get_color(tag)
+            continue
+
+        name = basename(tag.get('name'))  # type: ignore
+        image = {key: value for key, value in tag.items()}
+        image['name'] = name
+        image['shapes'] = get_shapes(tag)
+        annotations[name] = image
+
+        tag.clear()
+        while tag.getprevious() is not None:
+            del tag.getparent()[0]
+    return color, annotations
+
+
+def create_overlay(width: int, height: int, shapes: list[dict],
+                   color: tuple) -> np.ndarray:
     """Return overlay image with shapes from annotation.
 
     Args:
         width (int): image width.
         height (int): image height.
         shapes (list[dict]): shapes to draw.
+        color (tuple): mask color.
 
     Returns:
         np.ndarray: overlay image.
@@ -127,22 +148,17 @@ def create_overlay(width: int, height: int, shapes: list[dict]) -> np.ndarray:
     overlay = np.zeros((height, width, 3), np.uint8)
     ignore = np.zeros((height, width, 3), np.uint8)
 
-    overlay_points = []
-    ignore_points = []
+    # Polygons points grouped by whether shape label is 'Ignore'
+    points = {False: [], True: []}
 
     for shape in shapes:
-        points = [
-            tuple(map(float, point.split(',')))
-            for point in shape['points'].split(';')
-        ]
-        points = np.array(points).astype(int)
-        if shape['label'] != 'Ignore':
-            overlay_points.append(points)
-        else:
-            ignore_points.append(points)
+        shape_points = np.fromstring(shape['points'].replace(';', ','),
+                                     sep=',')
+        shape_points = shape_points.reshape(-1, 2).astype(np.int32)
+        points[shape['label'] == 'Ignore'].append(shape_points)
 
-    overlay = cv.fillPoly(overlay, overlay_points, color=color)
-    ignore = cv.fillPoly(ignore, ignore_points, color=color)
+    overlay = cv.fillPoly(overlay, points[False], color=color)
+    ignore = cv.fillPoly(ignore, points[True], color=color)
 
     overlay = cv.bitwise_xor(overlay, ignore)
     return overlay
@@ -158,11 +174,44 @@ def apply_mask(background: np.ndarray, overlay: np.ndarray) -> np.ndarray:
     Returns:
         np.ndarray: result image.
     """
-    mask = overlay.astype(bool)
-    background[mask] = cv.addWeighted(background, 0.0, overlay, 1.0, 0.0)[mask]
+    # Overlay is its own mask: only its non-zero elements are copied
+    background = cv.copyTo(overlay, overlay, background)
     return background
 
 
+def process_image(image: Path, annotation: dict, color: tuple,
+                  paths: list[Path]) -> None:
+    """Write mask and mask on photo for image.
+
+    Args:
+        image (Path): source image.
+        annotation (dict): annotation for image.
+        color (tuple): mask color.
+        paths (list[Path]): directories for mask and mask on photo.
+    """
+    current_image = cv.imread(f'{image}')
+    height, width = current_image.shape[:2]
+
+    # Source image isn't used after masking, so it's painted in place
+    backgrounds = [np.zeros_like(current_image), current_image]
+
+    overlay = create_overlay(width, height, annotation['shapes'], color)
+
+    # OpenCV releases GIL while encoding, so images are written by threads
+    # and the next result is computed meanwhile
+    with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+        writes = []
+        for bg, path in zip(backgrounds, paths):
+            result = apply_mask(bg, overlay)
+
+            output_path = Path(f'{path}/{path.name}-{image.name}')
+            writes.append(executor.submit(cv.imwrite, f'{output_path}',
+                                          result))
+
+    for write in writes:
+        write.result()
+
+
 if __name__ == '__main__':
     try:
         images = get_files('.jpg', 'images')
@@ -172,29 +221,19 @@ if __name__ == '__main__':
     except ValueError as err:
         print(f'Extension must be .xml, not {err}.')
     else:
-        tree = ET.parse(annotations)
-        color = get_color(tree)
+        color, annotations_by_name = parse_annotations(annotations)
 
         dir_names = ['mask', 'mask_on_photo']
         paths = make_directories(dir_names)
 
-        for image in images:
-            current_image = cv.imread(f'{image}')
-            height, width = current_image.shape[:2]
-
-            backgrounds = [
-                np.zeros((height, width, 3), np.uint8),
-                np.full((height, width, 3), current_image, dtype=np.uint8)
-            ]
-
-            annotation = parse_annotation(tree, image.name)
-
-            for bg, path in zip(backgrounds, paths):
-                overlay = create_overlay(width, height, annotation['shapes'])
-                result = apply_mask(bg, overlay)
+        image_annotations = [
+            annotations_by_name[image.name] for image in images
+        ]
 
-                output_path = Path(f'{path}/{path.name}-{image.name}')
-                cv.imwrite(f'{output_path}', result)
+        with ProcessPoolExecutor() as executor:
+            list(
+                executor.map(process_image, images, image_annotations,
+                             repeat(color), repeat(paths)))
 
     finally:
         print('Script is stopped!')